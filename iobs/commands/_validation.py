@@ -0,0 +1,66 @@
+# Copyright (c) 2018, UofL Computer Systems Lab.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without event the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+
+import os
+import sys
+
+from iobs.errors import (
+    ConfigNotFoundError,
+    InvalidOSError,
+    InvalidPrivilegesError
+)
+
+
+def validate_inputs_exist(inputs):
+    """Checks whether all of the input files exist.
+
+    Args:
+        inputs: The input files.
+
+    Raises:
+        ConfigNotFoundError: If any input file doesn't exist.
+    """
+    missing = [i for i in inputs if not os.path.isfile(i)]
+
+    if missing:
+        raise ConfigNotFoundError(
+            'Config file(s) not found: {}'.format(', '.join(missing))
+        )
+
+
+def validate_os():
+    """Checks whether the required operating system is in use.
+
+    Raises:
+        InvalidOSError: If OS is not Linux.
+    """
+    if not sys.platform.startswith('linux'):
+        raise InvalidOSError(
+            'OS is {}, must be Linux.'.format(sys.platform)
+        )
+
+
+def validate_privileges():
+    """Checks whether the script is ran with administrative privileges.
+
+    Raises:
+        InvalidPrivilegesError: If script isn't ran with sudo privileges.
+    """
+    if os.getuid() != 0:
+        raise InvalidPrivilegesError(
+            'Script must be run with administrative privileges.'
+        )
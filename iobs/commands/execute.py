@@ -18,14 +18,13 @@
 import argparse
 import logging
 import os
-import platform
 
-from iobs.errors import (
-    InvalidOSError,
-    InvalidPrivilegesError,
-    IOBSBaseException
+from iobs.commands._validation import (
+    validate_inputs_exist,
+    validate_os,
+    validate_privileges
 )
-from iobs.input import parse_config_file
+from iobs.errors import IOBSBaseException
 from iobs.output import printf, PrintType
 from iobs.settings import SettingsManager
 
@@ -36,23 +35,22 @@ def check_args(args):
     Args:
         args: The arguments to check.
     """
-    SettingsManager.set('output_directory', args.output_directory)
     os.makedirs(args.output_directory, exist_ok=True)
 
     if args.log_file:
-        SettingsManager.set('log_enabled', True)
         log_level = get_log_level(args.log_level)
-        log_path = os.path.join(args.log_file)
-        logging.basicConfig(filename=log_path, level=log_level,
+        logging.basicConfig(filename=args.log_file, level=log_level,
                             format='%(asctime)s - %(message)s')
-    else:
-        SettingsManager.set('log_enabled', False)
 
-    SettingsManager.set('continue_on_failure', args.continue_on_failure)
-    SettingsManager.set('reset_device', args.reset_device)
-    SettingsManager.set('retry_count', args.retry_count)
-    SettingsManager.set('silent', args.silent)
-    SettingsManager.set('cleanup_files', args.cleanup_files)
+    SettingsManager.update({
+        'cleanup_files': args.cleanup_files,
+        'continue_on_failure': args.continue_on_failure,
+        'log_enabled': bool(args.log_file),
+        'output_directory': args.output_directory,
+        'reset_device': args.reset_device,
+        'retry_count': args.retry_count,
+        'silent': args.silent
+    })
 
 
 def get_log_level(log_level):
@@ -71,29 +69,6 @@ def get_log_level(log_level):
     return logging.ERROR
 
 
-def validate_os():
-    """Checks whether the required operating system is in use.
-
-    Raises:
-        InvalidOSError: If OS is not Linux.
-    """
-    ps = platform.system()
-    if ps != 'Linux':
-        raise InvalidOSError('OS is {}, must be Linux.'.format(ps))
-
-
-def validate_privileges():
-    """Checks whether the script is ran with administrative privileges.
-
-    Raises:
-        InvalidPrivilegesError: If script isn't ran with sudo privileges.
-    """
-    if os.getuid() != 0:
-        raise InvalidPrivilegesError(
-            'Script must be run with administrative privileges.'
-        )
-
-
 def execute(args):
     """Executes workloads.
 
@@ -110,31 +85,52 @@ def execute(args):
     validate_os()
     validate_privileges()
 
+    # NOTE: With continue_on_failure, missing inputs are reported as they're
+    # reached so the remaining inputs still run.
+    if not args.continue_on_failure:
+        validate_inputs_exist(args.inputs)
+
+    # NOTE: Imported here so --help and argument errors skip the ~18 ms of
+    # configuration module imports.
+    from iobs.input import parse_config_file
+
     printf('Beginning program execution...',
            print_type=PrintType.NORMAL | PrintType.INFO_LOG)
 
+    total = len(args.inputs)
+    continue_on_failure, reset_device = SettingsManager.get(
+        'continue_on_failure', 'reset_device'
+    )
+
+    # Devices are restored after each input, so the environment saved when a
+    # device is first seen applies to every later input using it.
+    device_environments = {}
+
     for i, input_file in enumerate(args.inputs):
+        configuration = None
+
         try:
             printf('Processing input file {} ({} of {})'
-                   .format(input_file, i + 1, len(args.inputs)))
+                   .format(input_file, i + 1, total))
 
             configuration = parse_config_file(input_file)
             configuration.validate()
 
-            if args.reset_device:
+            if reset_device:
                 configuration.save_system_environment()
-                configuration.save_device_environments()
+                configuration.save_device_environments(device_environments)
 
             configuration.process()
         except IOBSBaseException as err:
-            if not SettingsManager.get('continue_on_failure'):
+            if not continue_on_failure:
                 raise err
 
             printf('input file {} failed all retries. Continuing execution '
                    'of remaining files...\n{}'.format(input_file, err),
                    print_type=PrintType.ERROR | PrintType.ERROR_LOG)
         finally:
-            if args.reset_device:
+            # NOTE: Configuration is None if the input file failed to parse
+            if reset_device and configuration is not None:
                 configuration.restore_system_environment()
                 configuration.restore_device_environments()
 
@@ -16,38 +16,60 @@
 
 
 import argparse
-import os
-import platform
+import hashlib
 
-from iobs.errors import (
-    InvalidOSError,
-    InvalidPrivilegesError,
+from iobs.commands._validation import (
+    validate_inputs_exist,
+    validate_os,
+    validate_privileges
 )
-from iobs.input import parse_config_file
 from iobs.output import printf, PrintType
 
 
-def validate_os():
-    """Checks whether the required operating system is in use.
+def get_file_digest(input_file):
+    """Retrieves a digest of the contents of a file.
 
-    Raises:
-        InvalidOSError: If OS is not Linux.
+    Args:
+        input_file: The file to digest.
+
+    Returns:
+        The digest of the file, or None if it couldn't be read.
     """
-    ps = platform.system()
-    if ps != 'Linux':
-        raise InvalidOSError('OS is {}, must be Linux.'.format(ps))
+    try:
+        with open(input_file, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    except OSError:
+        return None
 
 
-def validate_privileges():
-    """Checks whether the script is ran with administrative privileges.
+def is_duplicate_input(input_file, index, total, seen):
+    """Checks whether an identical input file has already been validated.
 
-    Raises:
-        InvalidPrivilegesError: If script isn't ran with sudo privileges.
+    Input files with the same contents validate the same way, so only the
+    first of them needs to be validated.
+
+    Args:
+        input_file: The input file.
+        index: The index of the input file.
+        total: The total number of input files.
+        seen: A mapping of digests to the input files already seen.
+
+    Returns:
+        True if an identical input file has been seen, else False.
     """
-    if os.getuid() != 0:
-        raise InvalidPrivilegesError(
-            'Script must be run with administrative privileges.'
-        )
+    digest = get_file_digest(input_file)
+
+    # NOTE: Unreadable files are never skipped so the error is reported.
+    if digest is None:
+        return False
+
+    if digest in seen:
+        printf('Skipping input file {} ({} of {}), identical to {}'
+               .format(input_file, index + 1, total, seen[digest]))
+        return True
+
+    seen[digest] = input_file
+    return False
 
 
 def validate(args):
@@ -64,13 +86,23 @@ def validate(args):
     """
     validate_os()
     validate_privileges()
+    validate_inputs_exist(args.inputs)
+
+    # NOTE: Deferred as in iobs.commands.execute
+    from iobs.input import parse_config_file
 
     printf('Beginning program validation...',
            print_type=PrintType.NORMAL | PrintType.INFO_LOG)
 
+    total = len(args.inputs)
+    seen = {}
+
     for i, input_file in enumerate(args.inputs):
+        if is_duplicate_input(input_file, i, total, seen):
+            continue
+
         printf('Validating input file {} ({} of {})'
-               .format(input_file, i + 1, len(args.inputs)))
+               .format(input_file, i + 1, total))
 
         configuration = parse_config_file(input_file)
         configuration.validate()
@@ -16,6 +16,7 @@
 
 
 from abc import ABC, abstractmethod
+from collections import deque
 
 from iobs.errors import InvalidSettingError
 from iobs.output import printf, PrintType
@@ -39,6 +40,9 @@ class ConfigAttribute:
         dependent_attributes: Other attributes which this is dependent on.
         default_value: Default value if none explicitly assigned.
     """
+    __slots__ = ('conversion_fn', 'validation_fn', 'dependent_attributes',
+                 'default_value', 'default_used')
+
     def __init__(self, conversion_fn=lambda x: str(x),
                  validation_fn=lambda x: True,
                  dependent_attributes=None,
@@ -64,6 +68,25 @@ class ConfigSectionBase(ABC):
             value: The value.
         """
 
+    def _set_setting(self, setting, value):
+        """Converts a defined setting's value and sets it.
+
+        Args:
+            setting: The setting.
+            value: The raw value.
+
+        Raises:
+            InvalidSettingError: If the value cannot be converted.
+        """
+        sa = self._settings[setting]
+
+        try:
+            setattr(self, setting, sa.conversion_fn(value))
+        except (TypeError, ValueError) as err:
+            raise InvalidSettingError(
+                'Setting {}={} is not valid\n{}'.format(setting, value, err)
+            )
+
     @abstractmethod
     def _get_settings(self):
         """Retrieves the SettingAttributes for the configuration object.
@@ -78,38 +101,36 @@ class ConfigSectionBase(ABC):
         Raises:
             InvalidSettingError: If settings are not valid or dependencies not met.
         """
-        # NOTE: Assumes that there are no circular dependencies
-        roots = {
+        # NOTE: Settings are validated in dependency order, and otherwise in
+        # the order they are defined, so errors are reported deterministically.
+        roots = deque(
             k for k, v in self._settings.items()
             if not v.dependent_attributes
-        }
-        unvalidated = {
-            k for k, v in self._settings.items()
-            if v.dependent_attributes
-        }
-        inc_deps = {s: set() for s in self._settings}
-        out_deps = {
-            k: set(v.dependent_attributes)
+        )
+        remaining_deps = {
+            k: len(set(v.dependent_attributes))
             for k, v in self._settings.items()
             if v.dependent_attributes
         }
+        inc_deps = {s: [] for s in self._settings}
 
         for k, v in self._settings.items():
             if v.dependent_attributes:
-                for dep in v.dependent_attributes:
-                    inc_deps[dep].add(k)
+                for dep in set(v.dependent_attributes):
+                    inc_deps[dep].append(k)
 
         while roots:
-            setting_name = roots.pop()
+            setting_name = roots.popleft()
             setting = self._settings[setting_name]
             self._validate_setting(setting_name, setting)
 
             for dep in inc_deps[setting_name]:
-                out_deps[dep].remove(setting_name)
-                if not out_deps[dep]:
-                    del out_deps[dep]
-                    unvalidated.remove(dep)
-                    roots.add(dep)
+                remaining_deps[dep] -= 1
+                if not remaining_deps[dep]:
+                    del remaining_deps[dep]
+                    roots.append(dep)
+
+        unvalidated = list(remaining_deps)
 
         if unvalidated:
             raise InvalidSettingError(
@@ -224,23 +245,36 @@ class Configuration:
                print_type=PrintType.DEBUG_LOG)
 
         se = self._system_environment
-        change_randomize_va_space(se['randomize_va_space'])
 
-    def save_device_environments(self):
+        # NOTE: Nothing is saved if validation failed before saving
+        if 'randomize_va_space' in se:
+            change_randomize_va_space(se['randomize_va_space'])
+
+    def save_device_environments(self, saved_environments=None):
         """Saves device environment information so it can be restored.
 
         NOTE: This should be called after `validate` has bee called.
+
+        Args:
+            saved_environments: Optional mapping of device to environments
+                saved previously in the session. Devices found in it are not
+                read again, and devices read are added to it.
         """
         printf('Saving device information...',
                print_type=PrintType.DEBUG_LOG)
 
-        for device in self._global_configuration.devices:
-            self._device_environments[device] = {
-                'nomerges': get_device_nomerges(device),
-                'scheduler': get_device_scheduler(device)
-            }
+        if saved_environments is None:
+            saved_environments = {}
 
-            de = self._device_environments[device]
+        for device in self._global_configuration.devices:
+            if device not in saved_environments:
+                saved_environments[device] = {
+                    'nomerges': get_device_nomerges(device),
+                    'scheduler': get_device_scheduler(device)
+                }
+
+            de = saved_environments[device]
+            self._device_environments[device] = de
 
             printf('Saving device {} environment: {}'.format(device, de),
                    print_type=PrintType.DEBUG_LOG)
@@ -48,8 +48,7 @@ class EnvironmentConfiguration(ConfigSectionBase):
         if setting not in self._settings:
             raise InvalidSettingError('Setting {} is not valid'.format(setting))
 
-        sa = self._settings[setting]
-        setattr(self, setting, sa.conversion_fn(value))
+        self._set_setting(setting, value)
 
     def get_environment_permutations(self, device):
         """Creates environment setting permutation generator and applies each.
@@ -74,8 +73,7 @@ class EnvironmentConfiguration(ConfigSectionBase):
             device: The device.
             setting_permutation: The permutated settings.
         """
-        for setting in setting_permutation:
-            name, value = setting.split('=')
+        for name, value in setting_permutation:
             if name == 'nomerges':
                 change_nomerges(device, value)
 
@@ -83,17 +81,14 @@ class EnvironmentConfiguration(ConfigSectionBase):
         """Retrieves setting permutations.
 
         Returns:
-            A list of setting permutation lists which are mappings of
-            `setting_name=setting_value`.
+            An iterator of setting permutations, each a tuple of
+            `(setting_name, setting_value)` tuples.
         """
-        setting_perm = []
-
-        for setting in self._get_permutate_settings():
-            if not self._settings[setting].default_used:
-                setting_perm.append([
-                    '{}={}'.format(setting, value)
-                    for value in getattr(self, setting)
-                ])
+        setting_perm = [
+            [(setting, value) for value in getattr(self, setting)]
+            for setting in self._get_permutate_settings()
+            if not self._settings[setting].default_used
+        ]
 
         return itertools.product(*setting_perm)
 
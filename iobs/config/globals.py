@@ -50,8 +50,7 @@ class GlobalConfiguration(ConfigSectionBase):
         if setting not in self._settings:
             raise InvalidSettingError('Setting {} is not valid'.format(setting))
 
-        sa = self._settings[setting]
-        setattr(self, setting, sa.conversion_fn(value))
+        self._set_setting(setting, value)
 
     def _get_settings(self):
         """Retrieves the ConfigAttributes for the configuration object.
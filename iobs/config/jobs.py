@@ -16,9 +16,17 @@
 
 
 from abc import ABC, abstractmethod
+import glob
 import json
+import os
+import time
 
-from iobs.output import printf, PrintType
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from iobs.output import is_printable, printf, PrintType
 from iobs.errors import (
     JobExecutionError,
     OutputParsingError
@@ -32,10 +40,48 @@ from iobs.process import (
     run_command_nowait
 )
 from iobs.settings import (
+    get_device_name,
     get_formatter,
-    match_regex
+    get_regex
+)
+
+
+# Metric names produced for each btt latency row, in btt column order
+_BLKTRACE_METRIC_KEYS = {
+    name: tuple('{}-{}'.format(name, stat) for stat in ('min', 'avg', 'max', 'n'))
+    for name in ('d2c', 'g2i', 'i2d', 'q2c', 'q2g', 'q2q')
+}
+
+
+# fio read/write metrics as (name, json section, json field)
+_FIO_RW_METRICS = (
+    ('total-ios', None, 'total_ios'),  # IO
+    ('io-kbytes', None, 'io_kbytes'),  # KB
+    ('bw', None, 'bw'),  # MB/s
+    ('iops', None, 'iops'),  # IO/s
+    ('lat-min', 'lat_ns', 'min'),  # ns
+    ('lat-max', 'lat_ns', 'max'),  # ns
+    ('lat-mean', 'lat_ns', 'mean'),  # ns
+    ('lat-stddev', 'lat_ns', 'stddev'),  # ns
+    ('slat-min', 'slat_ns', 'min'),  # ns
+    ('slat-max', 'slat_ns', 'max'),  # ns
+    ('slat-mean', 'slat_ns', 'mean'),  # ns
+    ('slat-stddev', 'slat_ns', 'stddev'),  # ns
+    ('clat-min', 'clat_ns', 'min'),  # ns
+    ('clat-max', 'clat_ns', 'max'),  # ns
+    ('clat-mean', 'clat_ns', 'mean'),  # ns
+    ('clat-stddev', 'clat_ns', 'stddev')  # ns
 )
 
+# Metric keys for each of 'read' and 'write'
+_FIO_RW_METRIC_KEYS = {
+    rw: tuple(
+        ('{}-{}'.format(name, rw), section, field)
+        for name, section, field in _FIO_RW_METRICS
+    )
+    for rw in ('read', 'write')
+}
+
 
 class Job(ABC):
     """A single unit of work to be executed.
@@ -45,9 +91,12 @@ class Job(ABC):
         device: The device.
         scheduler: The scheduler.
     """
+    __slots__ = ('file', 'device', 'device_name', 'scheduler')
+
     def __init__(self, file, device, scheduler):
         self.file = file
         self.device = device
+        self.device_name = get_device_name(device)
         self.scheduler = scheduler
 
     @abstractmethod
@@ -67,6 +116,8 @@ class Job(ABC):
         clear_caches(self.device)
 
         if use_blktrace:
+            bp = None
+
             try:
                 bp = self.run_blktrace()
                 job_metrics = self.execute()
@@ -74,6 +125,11 @@ class Job(ABC):
                 job_metrics.update(blktrace_metrics)
                 return job_metrics
             except (JobExecutionError, OutputParsingError) as err:
+                # NOTE: blktrace must be stopped, otherwise it keeps the
+                # device busy and every retry fails to start tracing.
+                if bp is not None and bp.returncode is None:
+                    terminate_process(bp)
+
                 ProcessManager.clear_processes()
                 raise err
 
@@ -85,15 +141,69 @@ class Job(ABC):
         Returns:
             The blktrace process.
         """
-        device_name = match_regex(self.device, 'device_name')
-        command = get_formatter('blktrace').format(self.device, device_name)
+        command = get_formatter('blktrace').format(self.device,
+                                                   self.device_name)
+
+        # NOTE: Trace files left over from a prior run are removed so that
+        # waiting for them only succeeds once this blktrace has started.
+        trace_pattern = get_formatter('blktrace_trace').format(self.device_name)
+        for trace_file in glob.glob(trace_pattern):
+            try:
+                os.remove(trace_file)
+            except OSError as err:
+                raise JobExecutionError(
+                    'Unable to remove trace file {}\n{}'.format(trace_file, err)
+                )
+
+        start_time = time.monotonic()
         p = run_command_nowait(command)
 
         if p is None:
             raise JobExecutionError('Unable to run {}'.format(command))
 
+        self._wait_for_blktrace(p, start_time)
+
         return p
 
+    def _wait_for_blktrace(self, process, start_time, timeout=5):
+        """Waits for blktrace to create its trace files.
+
+        Polls with a short, growing interval so the job starts as soon as
+        tracing is set up.
+
+        Args:
+            process: The blktrace process.
+            start_time: The `time.monotonic()` value when blktrace was started.
+            timeout: (OPTIONAL) The maximum seconds to wait. Defaults to 5.
+
+        Raises:
+            JobExecutionError: If blktrace exits or times out before creating
+                its trace files.
+        """
+        pattern = get_formatter('blktrace_trace').format(self.device_name)
+        deadline = start_time + timeout
+        interval = 0.01
+
+        while True:
+            if process.poll() is not None:
+                raise JobExecutionError(
+                    'blktrace exited for device {} with return code {}'
+                    .format(self.device, process.returncode)
+                )
+
+            # NOTE: Stale trace files were removed before blktrace started
+            if glob.glob(pattern):
+                return
+
+            if time.monotonic() >= deadline:
+                terminate_process(process)
+                raise JobExecutionError(
+                    'blktrace did not start for device {}'.format(self.device)
+                )
+
+            time.sleep(interval)
+            interval = min(interval * 2, 0.5)
+
     def process_blktrace(self, process):
         """Finishes and processes a blktrace process.
 
@@ -111,18 +221,18 @@ class Job(ABC):
                 .format(self.device)
             )
 
-        device_name = match_regex(self.device, 'device_name')
-        blkparse_command = get_formatter('blkparse').format(device_name)
+        blkparse_command = get_formatter('blkparse').format(self.device_name)
 
-        blkparse_out, _ = run_command(blkparse_command)
+        # blkparse writes its binary output to a file, so stdout is unused
+        _, blkparse_rc = run_command(blkparse_command, ignore_output=True)
 
-        if blkparse_out is None:
+        if blkparse_rc is None:
             raise JobExecutionError(
                 'Unable to run blkparse for device {}'
                 .format(self.device)
             )
 
-        btt_command = get_formatter('btt').format(device_name)
+        btt_command = get_formatter('btt').format(self.device_name)
         btt_out, _ = run_command(btt_command)
 
         if btt_out is None:
@@ -131,9 +241,10 @@ class Job(ABC):
                 .format(self.device)
             )
 
-        bts = self.get_btt_out_short(btt_out)
-        printf('Blktrace output:\n{}'.format(bts),
-               print_type=PrintType.DEBUG_LOG)
+        if is_printable(PrintType.DEBUG_LOG):
+            bts = self.get_btt_out_short(btt_out)
+            printf('Blktrace output:\n{}'.format(bts),
+                   print_type=PrintType.DEBUG_LOG)
 
         return self.collect_blktrace_output(btt_out)
 
@@ -153,18 +264,16 @@ class Job(ABC):
         Raises:
             OutputParsingError: If unable to parse raw output.
         """
-        mnames = {'d2c', 'g2i', 'i2d', 'q2c', 'q2g', 'q2q'}
-
         try:
             ret = {}
-            for line in output.split('\n'):
-                t = line[:3].lower()
-                if t in mnames:
-                    ls = line.split()
-                    ret['{}-min'.format(t)] = ls[1]
-                    ret['{}-avg'.format(t)] = ls[2]
-                    ret['{}-max'.format(t)] = ls[3]
-                    ret['{}-n'.format(t)] = ls[4]
+            for match in get_regex('btt_latency').finditer(output):
+                keys = _BLKTRACE_METRIC_KEYS[match[1].lower()]
+                ls = match[0].split()
+                min_key, avg_key, max_key, n_key = keys
+                ret[min_key] = ls[1]
+                ret[avg_key] = ls[2]
+                ret[max_key] = ls[3]
+                ret[n_key] = ls[4]
 
             return ret
         except (KeyError, IndexError) as err:
@@ -175,6 +284,8 @@ class Job(ABC):
 
 class FilebenchJob(Job):
     """A Filebench Job."""
+    __slots__ = ()
+
     def get_command(self):
         """Retrieves the command to execute.
 
@@ -299,13 +410,17 @@ class FilebenchJob(Job):
                 .format(command, self.device)
             )
 
-        printf('Job output:\n{}'.format(out), print_type=PrintType.DEBUG_LOG)
+        if is_printable(PrintType.DEBUG_LOG):
+            printf('Job output:\n{}'.format(out),
+                   print_type=PrintType.DEBUG_LOG)
 
         return self.collect_output(out)
 
 
 class FIOJob(Job):
     """An FIO Job."""
+    __slots__ = ()
+
     def get_command(self):
         """Retrieves the command to execute.
 
@@ -327,14 +442,12 @@ class FIOJob(Job):
             OutputParsingError: If unable to parse raw output.
         """
         try:
-            data = json.loads(output, encoding='utf-8')
+            data = json_loads(output)
             job_data = data['jobs'][0]
 
-            metrics = {
-                **self._parse_job_other(job_data),
-                **self._parse_job_rw(job_data['read'], 'read'),
-                **self._parse_job_rw(job_data['write'], 'write')
-            }
+            metrics = self._parse_job_other(job_data)
+            metrics.update(self._parse_job_rw(job_data['read'], 'read'))
+            metrics.update(self._parse_job_rw(job_data['write'], 'write'))
 
             return metrics
         except (json.JSONDecodeError, KeyError, IndexError) as err:
@@ -353,22 +466,8 @@ class FIOJob(Job):
             A dictionary mapping the metric names to their values.
         """
         metrics = {
-            'total-ios-{}'.format(rw): data['total_ios'],  # IO
-            'io-kbytes-{}'.format(rw): data['io_kbytes'],  # KB
-            'bw-{}'.format(rw): data['bw'],  # MB/s
-            'iops-{}'.format(rw): data['iops'],  # IO/s
-            'lat-min-{}'.format(rw): data['lat_ns']['min'],  # ns
-            'lat-max-{}'.format(rw): data['lat_ns']['max'],  # ns
-            'lat-mean-{}'.format(rw): data['lat_ns']['mean'],  # ns
-            'lat-stddev-{}'.format(rw): data['lat_ns']['stddev'],  # ns
-            'slat-min-{}'.format(rw): data['slat_ns']['min'],  # ns
-            'slat-max-{}'.format(rw): data['slat_ns']['max'],  # ns
-            'slat-mean-{}'.format(rw): data['slat_ns']['mean'],  # ns
-            'slat-stddev-{}'.format(rw): data['slat_ns']['stddev'],  # ns
-            'clat-min-{}'.format(rw): data['clat_ns']['min'],  # ns
-            'clat-max-{}'.format(rw): data['clat_ns']['max'],  # ns
-            'clat-mean-{}'.format(rw): data['clat_ns']['mean'],  # ns
-            'clat-stddev-{}'.format(rw): data['clat_ns']['stddev']  # ns
+            key: data[field] if section is None else data[section][field]
+            for key, section, field in _FIO_RW_METRIC_KEYS[rw]
         }
 
         if 'percentile' in data['lat_ns']:
@@ -411,6 +510,8 @@ class FIOJob(Job):
                 .format(command, self.device)
             )
 
-        printf('Job output:\n{}'.format(out), print_type=PrintType.DEBUG_LOG)
+        if is_printable(PrintType.DEBUG_LOG):
+            printf('Job output:\n{}'.format(out),
+                   print_type=PrintType.DEBUG_LOG)
 
         return self.collect_output(out)
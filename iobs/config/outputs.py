@@ -43,6 +43,8 @@ class OutputConfiguration(ConfigSectionBase):
     def __init__(self, input_file):
         super().__init__()
         self._input_file = input_file
+        self._output_file = None
+        self._permutation_info = {}
         self._wrote_header = False
         self.header_order = []
 
@@ -63,8 +65,7 @@ class OutputConfiguration(ConfigSectionBase):
             enable_blktrace: Whether blktrace is enabled.
         """
 
-    @abstractmethod
-    def _write_line(self, output,universal_metrics,
+    def _write_line(self, output, universal_metrics,
                     template_order, template_spd,
                     environment_order, environment_spd):
         """Writes a line of the output file.
@@ -76,7 +77,33 @@ class OutputConfiguration(ConfigSectionBase):
             template_spd: The template setting permutation in dict form.
             environment_order: The ordered of environment setting permutations.
             environment_spd: The environment setting permutation in dict form.
+
+        Raises:
+            OutputFormatError: If a metric in the header is missing and
+                `ignore_missing` is not set.
         """
+        output_file = self.get_output_file()
+
+        # Build the row in memory so it is written with a single call
+        line = []
+        for fi in self.header_order:
+            if fi in output:
+                line.append(output[fi])
+            elif fi in universal_metrics:
+                line.append(universal_metrics[fi])
+            elif fi in template_spd:
+                line.append(template_spd[fi])
+            elif fi in environment_spd:
+                line.append(environment_spd[fi])
+            elif self.ignore_missing:
+                line.append('NONE')
+            else:
+                raise OutputFormatError('Unable to write metric {}'.format(fi))
+
+        line.append('END\n')
+
+        with open(output_file, 'a') as f:
+            f.write(','.join(map(str, line)))
 
     @abstractmethod
     def _get_default_format(self):
@@ -99,8 +126,7 @@ class OutputConfiguration(ConfigSectionBase):
         if setting not in self._settings:
             raise InvalidSettingError('Setting {} is not valid'.format(setting))
 
-        sa = self._settings[setting]
-        setattr(self, setting, sa.conversion_fn(value))
+        self._set_setting(setting, value)
 
     def get_output_file(self):
         """Retrieves the output file name.
@@ -108,10 +134,15 @@ class OutputConfiguration(ConfigSectionBase):
         Returns:
             The output file name.
         """
-        output_base = os.path.basename(self._input_file)
-        output_file = os.path.splitext(output_base)[0] + '.csv'
-        output_directory = SettingsManager.get('output_directory')
-        return os.path.join(output_directory, output_file)
+        # NOTE: Built on first use, as the output directory is only known
+        # after the command-line arguments are checked.
+        if self._output_file is None:
+            output_base = os.path.basename(self._input_file)
+            output_file = os.path.splitext(output_base)[0] + '.csv'
+            output_directory = SettingsManager.get('output_directory')
+            self._output_file = os.path.join(output_directory, output_file)
+
+        return self._output_file
 
     def process(self, output, workload, device, scheduler,
                 template_setting_permutation, environment_setting_permutation,
@@ -127,19 +158,12 @@ class OutputConfiguration(ConfigSectionBase):
             environment_setting_permutation: The environment settings permutation.
             enable_blktrace: Whether to use blktrace metrics.
         """
-        template_order = None
-        template_spd = None
-
-        if self.append_template:
-            template_order = self._get_permutation_order(template_setting_permutation)
-            template_spd = self._get_permutation_setting_dict(template_setting_permutation)
-
-        environment_order = None
-        environment_spd = None
-
-        if self.append_environment:
-            environment_order = self._get_permutation_order(environment_setting_permutation)
-            environment_spd = self._get_permutation_setting_dict(environment_setting_permutation)
+        template_order, template_spd = self._get_permutation_info(
+            template_setting_permutation
+        )
+        environment_order, environment_spd = self._get_permutation_info(
+            environment_setting_permutation
+        )
 
         universal_metrics = {
             'workload': workload,
@@ -159,6 +183,27 @@ class OutputConfiguration(ConfigSectionBase):
                          template_order, template_spd,
                          environment_order, environment_spd)
 
+    def _get_permutation_info(self, setting_permutation):
+        """Retrieves the ordering and dictionary form of a setting permutation.
+
+        NOTE: The same permutation is processed once per repetition, so the
+        results are cached.
+
+        Args:
+            setting_permutation: The setting permutation.
+
+        Returns:
+            A tuple of the list of setting names and the dict mapping setting
+            name to value.
+        """
+        if setting_permutation not in self._permutation_info:
+            self._permutation_info[setting_permutation] = (
+                self._get_permutation_order(setting_permutation),
+                self._get_permutation_setting_dict(setting_permutation)
+            )
+
+        return self._permutation_info[setting_permutation]
+
     def _get_permutation_order(self, setting_permutation):
         """Retrieves a consistent ordering of setting permutation.
 
@@ -168,10 +213,7 @@ class OutputConfiguration(ConfigSectionBase):
         Returns:
             List of setting names.
         """
-        return sorted([
-            x.split('=')[0]
-            for x in setting_permutation
-        ])
+        return sorted(name for name, _ in setting_permutation)
 
     def _get_permutation_setting_dict(self, setting_permutation):
         """Converts a setting permutation into a dictionary mapping.
@@ -182,11 +224,7 @@ class OutputConfiguration(ConfigSectionBase):
         Returns:
             Dict mapping setting name to value.
         """
-        spd = {}
-        for sp in setting_permutation:
-            k, v = sp.split('=')
-            spd[k] = v
-        return spd
+        return dict(setting_permutation)
 
     def _get_settings(self):
         """Retrieves the ConfigAttributes for the configuration object.
@@ -330,104 +368,43 @@ class FilebenchOutputConfiguration(OutputConfiguration):
         fo = self._get_flowops_order(output)
         bt = set(self._get_blktrace_order())
 
-        with open(output_file, 'w+') as f:
-            for fi in self.format:
-                if fi in ft:
-                    header_order.append(ft[fi])
-                    f.write(ft[fi])
-                    f.write(',')
-                elif fi in ut:
-                    header_order.append(ut[fi])
-                    f.write(ut[fi])
-                    f.write(',')
-                elif fi in output:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif fi == 'flowops':
-                    if self.include_flowops:
-                        header_order.extend(fo)
-                        f.write(','.join(fo))
-                        f.write(',')
-                elif fi in template_spd:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif fi in environment_spd:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif fi in bt:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif self.ignore_missing:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                else:
-                    raise OutputFormatError(
-                        'Output format is invalid, unable to parse {}'.format(fi)
-                    )
-
-            if self.append_template:
-                for t in template_order:
-                    header_order.append(t)
-                    f.write(t)
-                    f.write(',')
-
-            if self.append_environment:
-                for t in environment_order:
-                    header_order.append(t)
-                    f.write(t)
-                    f.write(',')
-
-            if enable_blktrace and self.append_blktrace:
-                for t in self._get_blktrace_order():
-                    header_order.append(t)
-                    f.write(t)
-                    f.write(',')
-
-            f.write('END\n')
+        for fi in self.format:
+            if fi in ft:
+                header_order.append(ft[fi])
+            elif fi in ut:
+                header_order.append(ut[fi])
+            elif fi in output:
+                header_order.append(fi)
+            elif fi == 'flowops':
+                if self.include_flowops:
+                    header_order.extend(fo)
+            elif fi in template_spd:
+                header_order.append(fi)
+            elif fi in environment_spd:
+                header_order.append(fi)
+            elif fi in bt:
+                header_order.append(fi)
+            elif self.ignore_missing:
+                header_order.append(fi)
+            else:
+                raise OutputFormatError(
+                    'Output format is invalid, unable to parse {}'.format(fi)
+                )
 
-        return header_order
+        if self.append_template:
+            header_order.extend(template_order)
 
-    def _write_line(self, output, universal_metrics,
-                    template_order, template_spd,
-                    environment_order, environment_spd):
-        """Writes a line of the output file.
+        if self.append_environment:
+            header_order.extend(environment_order)
 
-        Args:
-            output: The job output.
-            universal_metrics: A dictionary of universal metrics.
-            template_order: The ordered of template setting permutations.
-            template_spd: The template setting permutation in dict form.
-            environment_order: The ordered of environment setting permutations.
-            environment_spd: The environment setting permutation in dict form.
-        """
-        output_file = self.get_output_file()
+        if enable_blktrace and self.append_blktrace:
+            header_order.extend(self._get_blktrace_order())
 
-        with open(output_file, 'a') as f:
-            for fi in self.header_order:
-                if fi in output:
-                    f.write(str(output[fi]))
-                    f.write(',')
-                elif fi in universal_metrics:
-                    f.write(str(universal_metrics[fi]))
-                    f.write(',')
-                elif fi in template_spd:
-                    f.write(str(template_spd[fi]))
-                    f.write(',')
-                elif fi in environment_spd:
-                    f.write(str(environment_spd[fi]))
-                    f.write(',')
-                elif self.ignore_missing:
-                    f.write('NONE')
-                    f.write(',')
-                else:
-                    raise OutputFormatError('Unable to write metric {}'.format(fi))
-
-            f.write('END\n')
+        # Build the header in memory so it is written with a single call
+        with open(output_file, 'w+') as f:
+            f.write(','.join(header_order + ['END\n']))
+
+        return header_order
 
 
 class FIOOutputConfiguration(OutputConfiguration):
@@ -577,9 +554,21 @@ class FIOOutputConfiguration(OutputConfiguration):
             )
         }
 
-    def _compare_percentile_format(self, setting_name, percentile_metric):
-        pms = percentile_metric.split('-')
-        return setting_name == '-'.join([pms[0], pms[1], pms[3]])
+    def _get_percentile_index(self, percentile_order):
+        """Groups percentiles by their format name.
+
+        Args:
+            percentile_order: The percentiles in ascending order.
+
+        Returns:
+            A dictionary mapping format names to lists of percentiles, each
+            in ascending order.
+        """
+        pi = {}
+        for p in percentile_order:
+            pms = p.split('-')
+            pi.setdefault('-'.join([pms[0], pms[1], pms[3]]), []).append(p)
+        return pi
 
     def _write_header(self, output, universal_metrics,
                       template_order, template_spd,
@@ -603,109 +592,44 @@ class FIOOutputConfiguration(OutputConfiguration):
         ut = self._get_universal_format_translation()
         lpt = self._get_lat_percentile_format_translation()
         cpt = self._get_clat_percentile_format_translation()
-        po = self._get_percentile_order(output)
+        pi = self._get_percentile_index(self._get_percentile_order(output))
         bt = set(self._get_blktrace_order())
 
-        with open(output_file, 'w+') as f:
-            for fi in self.format:
-                if fi in ft:
-                    header_order.append(ft[fi])
-                    f.write(ft[fi])
-                    f.write(',')
-                elif fi in ut:
-                    header_order.append(ut[fi])
-                    f.write(ut[fi])
-                    f.write(',')
-                elif fi in lpt:
-                    if self.include_lat_percentile:
-                        lp = [p for p in po
-                              if self._compare_percentile_format(fi, p)]
-                        header_order.extend(lp)
-                        f.write(','.join(lp))
-                        f.write(',')
-                elif fi in cpt:
-                    if self.include_clat_percentile:
-                        cp = [p for p in po
-                              if self._compare_percentile_format(fi, p)]
-                        header_order.extend(cp)
-                        f.write(','.join(cp))
-                        f.write(',')
-                elif fi in template_spd:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif fi in environment_spd:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif fi in bt:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                elif self.ignore_missing:
-                    header_order.append(fi)
-                    f.write(fi)
-                    f.write(',')
-                else:
-                    raise OutputFormatError(
-                        'Output format is invalid, unable to parse {}'.format(fi)
-                    )
-
-            if self.append_template:
-                for t in template_order:
-                    header_order.append(t)
-                    f.write(t)
-                    f.write(',')
-
-            if self.append_environment:
-                for t in environment_order:
-                    header_order.append(t)
-                    f.write(t)
-                    f.write(',')
-
-            if enable_blktrace and self.append_blktrace:
-                for t in self._get_blktrace_order():
-                    header_order.append(t)
-                    f.write(t)
-                    f.write(',')
-
-            f.write('END\n')
+        for fi in self.format:
+            if fi in ft:
+                header_order.append(ft[fi])
+            elif fi in ut:
+                header_order.append(ut[fi])
+            elif fi in lpt:
+                if self.include_lat_percentile:
+                    header_order.extend(pi.get(lpt[fi], []))
+            elif fi in cpt:
+                if self.include_clat_percentile:
+                    header_order.extend(pi.get(cpt[fi], []))
+            elif fi in template_spd:
+                header_order.append(fi)
+            elif fi in environment_spd:
+                header_order.append(fi)
+            elif fi in bt:
+                header_order.append(fi)
+            elif self.ignore_missing:
+                header_order.append(fi)
+            else:
+                raise OutputFormatError(
+                    'Output format is invalid, unable to parse {}'.format(fi)
+                )
 
-        return header_order
+        if self.append_template:
+            header_order.extend(template_order)
 
-    def _write_line(self, output, universal_metrics,
-                    template_order, template_spd,
-                    environment_order, environment_spd):
-        """Writes a line of the output file.
+        if self.append_environment:
+            header_order.extend(environment_order)
 
-        Args:
-            output: The job output.
-            universal_metrics: A dictionary of universal metrics.
-            template_order: The ordered of template setting permutations.
-            template_spd: The template setting permutation in dict form.
-            environment_order: The ordered of environment setting permutations.
-            environment_spd: The environment setting permutation in dict form.
-        """
-        output_file = self.get_output_file()
+        if enable_blktrace and self.append_blktrace:
+            header_order.extend(self._get_blktrace_order())
 
-        with open(output_file, 'a') as f:
-            for fi in self.header_order:
-                if fi in output:
-                    f.write(str(output[fi]))
-                    f.write(',')
-                elif fi in universal_metrics:
-                    f.write(str(universal_metrics[fi]))
-                    f.write(',')
-                elif fi in template_spd:
-                    f.write(str(template_spd[fi]))
-                    f.write(',')
-                elif fi in environment_spd:
-                    f.write(str(environment_spd[fi]))
-                    f.write(',')
-                elif self.ignore_missing:
-                    f.write('NONE')
-                    f.write(',')
-                else:
-                    raise OutputFormatError('Unable to write metric {}'.format(fi))
-
-            f.write('END\n')
+        # Build the header in memory so it is written with a single call
+        with open(output_file, 'w+') as f:
+            f.write(','.join(header_order + ['END\n']))
+
+        return header_order
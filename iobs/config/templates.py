@@ -17,6 +17,7 @@
 
 import itertools
 import os
+import re
 
 from iobs.config.base import (
     ConfigAttribute,
@@ -26,8 +27,8 @@ from iobs.errors import (
     InvalidSettingError
 )
 from iobs.settings import (
-    get_formatter,
-    match_regex
+    get_device_name,
+    get_formatter
 )
 from iobs.util import (
     cast_bool,
@@ -49,8 +50,7 @@ class TemplateConfiguration(ConfigSectionBase):
             value: The value.
         """
         if setting in self._settings:
-            sa = self._settings[setting]
-            setattr(self, setting, sa.conversion_fn(value))
+            self._set_setting(setting, value)
 
         else:
             setattr(self, setting, try_split(value, ','))
@@ -76,10 +76,22 @@ class TemplateConfiguration(ConfigSectionBase):
             )
 
         if self.enabled:
+            # NOTE: The template and the keys in it are the same for every
+            # permutation, only the values change.
+            with open(file, 'r') as f:
+                text = f.read()
+
+            pattern = self._get_template_pattern()
+
             for sp in self._get_setting_permutations():
-                temp_file_name = self._interpolate_file(file, device, scheduler, sp)
-                yield temp_file_name, sp
-                os.remove(temp_file_name)
+                temp_file_name = self._interpolate_file(file, text, pattern,
+                                                        device, scheduler, sp)
+                try:
+                    yield temp_file_name, sp
+                finally:
+                    # NOTE: Also removed if processing fails and the generator
+                    # is closed before reaching the next permutation.
+                    os.remove(temp_file_name)
         else:
             yield file, ()
 
@@ -87,24 +99,42 @@ class TemplateConfiguration(ConfigSectionBase):
         """Retrieves setting permutations.
 
         Returns:
-            A list of setting permutation lists which are mappings of
-            `setting_name=setting_value`.
+            An iterator of setting permutations, each a tuple of
+            `(setting_name, setting_value)` tuples.
         """
-        setting_perm = []
-
-        for setting in self._dynamic_settings:
-            setting_perm.append([
-                '{}={}'.format(setting, value)
-                for value in getattr(self, setting)
-            ])
+        setting_perm = [
+            [(setting, value) for value in getattr(self, setting)]
+            for setting in self._dynamic_settings
+        ]
 
         return itertools.product(*setting_perm)
 
-    def _interpolate_file(self, file, device, scheduler, sp):
-        """Creates a new file by reading and interpolating another.
+    def _get_template_pattern(self):
+        """Retrieves a pattern matching any of the template keys.
+
+        Returns:
+            A compiled regex pattern.
+        """
+        tf = get_formatter('template')
+
+        keys = {
+            tf.format(name) for name in itertools.chain(
+                ('device', 'device_name', 'scheduler'), self._dynamic_settings
+            )
+        }
+
+        # NOTE: Longer keys first so a key is never cut short by its prefix
+        return re.compile('|'.join(
+            re.escape(key) for key in sorted(keys, key=len, reverse=True)
+        ))
+
+    def _interpolate_file(self, file, text, pattern, device, scheduler, sp):
+        """Creates a new file by interpolating the text of another.
 
         Args:
             file: The input file.
+            text: The text of the input file.
+            pattern: The pattern matching the template keys.
             device: The device.
             scheduler: The scheduler.
             sp: The permutated template settings.
@@ -112,41 +142,54 @@ class TemplateConfiguration(ConfigSectionBase):
         Returns:
             The name of the new file.
         """
+        replacements = self._get_replacements(device, scheduler, sp)
+
         temp_file = file + '__temp__'
-        with open(file, 'r') as inp:
-            with open(temp_file, 'w') as out:
-                for line in inp:
-                    int_line = self._interpolate_text(
-                        line, device, scheduler, sp
-                    )
-                    out.write(int_line)
+        with open(temp_file, 'w') as out:
+            out.write(self._interpolate_text(text, pattern, replacements))
 
         return temp_file
 
-    def _interpolate_text(self, text, device, scheduler, sp):
-        """Interpolates text.
+    def _get_replacements(self, device, scheduler, sp):
+        """Retrieves the template keys and the values to replace them with.
 
         Args:
-            text: The text to interpolate.
             device: The device.
             scheduler: The scheduler.
             sp: The permutated template settings.
 
         Returns:
-            The interpolated text.
+            A dictionary mapping template keys to values.
         """
         tf = get_formatter('template')
-        device_name = match_regex(device, 'device_name')
 
-        text = text.replace(tf.format('device'), device)
-        text = text.replace(tf.format('device_name'), device_name)
-        text = text.replace(tf.format('scheduler'), scheduler)
+        replacements = {
+            tf.format('device'): device,
+            tf.format('device_name'): get_device_name(device),
+            tf.format('scheduler'): scheduler
+        }
+
+        for name, value in sp:
+            # NOTE: Earlier replacements take precedence, as they did when
+            # replacing each key in turn.
+            replacements.setdefault(tf.format(name), value)
+
+        return replacements
+
+    def _interpolate_text(self, text, pattern, replacements):
+        """Interpolates text.
 
-        for setting in sp:
-            name, value = setting.split('=')
-            text = text.replace(tf.format(name), value)
+        All template keys are replaced in a single pass over the text.
 
-        return text
+        Args:
+            text: The text to interpolate.
+            pattern: The pattern matching the template keys.
+            replacements: A mapping of template keys to values.
+
+        Returns:
+            The interpolated text.
+        """
+        return pattern.sub(lambda match: replacements[match.group(0)], text)
 
     def _get_settings(self):
         """Retrieves the ConfigAttributes for the configuration object.
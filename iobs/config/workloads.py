@@ -31,7 +31,6 @@ from iobs.output import printf, PrintType
 from iobs.process import cleanup_files
 from iobs.settings import (
     get_formatter,
-    match_regex,
     SettingsManager
 )
 
@@ -59,8 +58,7 @@ class WorkloadConfiguration(ConfigSectionBase):
         if setting not in self._settings:
             raise InvalidSettingError('Setting {} is not valid'.format(setting))
 
-        sa = self._settings[setting]
-        setattr(self, setting, sa.conversion_fn(value))
+        self._set_setting(setting, value)
 
     def process(self, job_type, output_configuration, global_configuration,
                 template_configuration, environment_configuration):
@@ -157,8 +155,7 @@ class WorkloadConfiguration(ConfigSectionBase):
                 ret = job.process(enable_blktrace)
 
                 if SettingsManager.get('cleanup_files'):
-                    device_name = match_regex(device, 'device_name')
-                    files = get_formatter('cleanup_blktrace').format(device_name)
+                    files = get_formatter('cleanup_blktrace').format(job.device_name)
                     cleanup_files(files)
 
                 return ret
@@ -15,7 +15,7 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
 
-from configparser import ConfigParser, ParsingError
+from configparser import ConfigParser, InterpolationError, ParsingError
 import os
 
 from iobs.config.base import Configuration
@@ -56,7 +56,13 @@ def parse_config_file(input_file):
     config_parser = ConfigParser()
 
     try:
-        config_parser.read(input_file, 'utf-8')
+        # Read in a single call rather than line by line through the parser
+        with open(input_file, 'r', encoding='utf-8') as f:
+            config_parser.read_string(f.read(), source=input_file)
+    except OSError as err:
+        raise InvalidConfigError(
+            'Unable to read config file {}\n{}'.format(input_file, err)
+        )
     except ParsingError as err:
         raise InvalidConfigError(
             'Invalid syntax in config file {}\n{}'.format(input_file, err)
@@ -89,19 +95,21 @@ def parse_config_file(input_file):
         environment_configuration
     )
 
+    section_configurations = {
+        environment_header: environment_configuration,
+        global_header: global_configuration,
+        output_header: output_configuration,
+        template_header: template_configuration
+    }
+
     for section in config_parser.sections():
-        if section == environment_header:
-            parse_section(config_parser, section, environment_configuration)
-        elif section == global_header:
-            parse_section(config_parser, section, global_configuration)
-        elif section == output_header:
-            parse_section(config_parser, section, output_configuration)
-        elif section == template_header:
-            parse_section(config_parser, section, template_configuration)
-        else:
+        section_configuration = section_configurations.get(section)
+        if section_configuration is None:
             workload_configuration = workload_configuration_type(section)
             parse_section(config_parser, section, workload_configuration)
             configuration.add_workload_configuration(workload_configuration)
+        else:
+            parse_section(config_parser, section, section_configuration)
 
     printf('Configuration file {} parsed successfully'.format(input_file),
            print_type=PrintType.DEBUG_LOG)
@@ -116,12 +124,20 @@ def parse_section(config_parser, section, config):
         config_parser: The config parser.
         section: The section name.
         config: The Configuration object.
+
+    Raises:
+        InvalidConfigError: If a value has invalid interpolation syntax.
     """
     printf('Parsing section {}'.format(section),
            print_type=PrintType.DEBUG_LOG)
 
-    for key, value in config_parser[section].items():
-        config.add_setting(key, value)
+    try:
+        for key, value in config_parser[section].items():
+            config.add_setting(key, value)
+    except InterpolationError as err:
+        raise InvalidConfigError(
+            'Invalid interpolation in section {}\n{}'.format(section, err)
+        )
 
 
 def get_workload_type(config_parser):
@@ -146,7 +162,13 @@ def get_workload_type(config_parser):
     if 'workload_type' not in global_section:
         raise InvalidConfigError('workload_type not defined in config')
 
-    workload_type = global_section['workload_type']
+    try:
+        workload_type = global_section['workload_type']
+    except InterpolationError as err:
+        raise InvalidConfigError(
+            'Invalid interpolation in workload_type\n{}'.format(err)
+        )
+
     valid_workloads = get_constant('valid_workload_types')
 
     if workload_type not in valid_workloads:
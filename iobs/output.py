@@ -35,6 +35,39 @@ class PrintType(enum.IntEnum):
     ERROR_LOG = 1 << 6
 
 
+_STDOUT_PRINT_TYPES = PrintType.NORMAL | PrintType.WARNING | PrintType.ERROR
+
+_LOG_LEVELS = (
+    (PrintType.ERROR_LOG, logging.ERROR),
+    (PrintType.INFO_LOG, logging.INFO),
+    (PrintType.DEBUG_LOG, logging.DEBUG)
+)
+
+
+def is_printable(print_type):
+    """Returns whether `printf` would output anything for `print_type`.
+
+    Useful to skip building expensive messages which would be discarded.
+
+    Args:
+        print_type: Where and how the text would be output.
+
+    Returns:
+        True if the text would be printed or logged, else False.
+    """
+    if print_type & _STDOUT_PRINT_TYPES and not SettingsManager.get('silent'):
+        return True
+
+    if not SettingsManager.get('log_enabled'):
+        return False
+
+    logger = logging.getLogger()
+    return any(
+        print_type & pt and logger.isEnabledFor(level)
+        for pt, level in _LOG_LEVELS
+    )
+
+
 def printf(*args, print_type=PrintType.NORMAL, **kwargs):
     """Prints to STDOUT or log file depending on `print_type`.
 
@@ -43,10 +76,14 @@ def printf(*args, print_type=PrintType.NORMAL, **kwargs):
         print_type: Where and how to output the text.
         kwargs: Keyword arguments to pass to the print and/or log function.
     """
-    args = [a.strip() if isinstance(a, str) else a for a in args]
     silent = SettingsManager.get('silent')
     log_enabled = SettingsManager.get('log_enabled')
 
+    if (silent or not print_type & _STDOUT_PRINT_TYPES) and not log_enabled:
+        return
+
+    args = [a.strip() if isinstance(a, str) else a for a in args]
+
     if not silent:
         if print_type & PrintType.NORMAL:
             print(*args, **kwargs)
@@ -16,8 +16,10 @@
 
 
 from collections import namedtuple
+import fcntl
 import os
 import shlex
+import shutil
 import signal
 import stat
 import subprocess
@@ -29,15 +31,20 @@ from iobs.errors import (
 )
 from iobs.output import printf, PrintType
 from iobs.settings import (
-    match_regex
+    get_device_name,
+    get_regex
 )
 
 
 CommandProcess = namedtuple('CommandProcess', ('command', 'process'))
 
+# ioctl request to flush a block device's buffers (linux/fs.h)
+_BLKFLSBUF = 0x1261
+
 
 class ProcessManager:
-    PROCESSES = []
+    # Tracked CommandProcesses keyed by process id
+    PROCESSES = {}
 
     @staticmethod
     def add_process(command, process):
@@ -47,7 +54,7 @@ class ProcessManager:
             command: The command being run in the process.
             process: The process.
         """
-        ProcessManager.PROCESSES.append(CommandProcess(command, process))
+        ProcessManager.PROCESSES[process.pid] = CommandProcess(command, process)
 
     @staticmethod
     def clear_finished_processes():
@@ -55,18 +62,13 @@ class ProcessManager:
 
         Returns:
             A list of finished CommandProcesses."""
-        finished_processes = []
-        process_index = 0
-
-        while process_index < len(ProcessManager.PROCESSES):
-            process = ProcessManager.PROCESSES[process_index]
-            if process[1].poll() in (None, 0):
-                ProcessManager.PROCESSES[process_index], ProcessManager.PROCESSES[-1] = \
-                    ProcessManager.PROCESSES[-1], ProcessManager.PROCESSES[process_index]
-                finished_processes.append(ProcessManager.PROCESSES[-1])
-                ProcessManager.PROCESSES.pop()
-            else:
-                process_index += 1
+        finished_processes = [
+            p for p in ProcessManager.PROCESSES.values()
+            if p.process.poll() in (None, 0)
+        ]
+
+        for p in finished_processes:
+            del ProcessManager.PROCESSES[p.process.pid]
 
         return finished_processes
 
@@ -76,14 +78,13 @@ class ProcessManager:
         ProcessManager.PROCESSES.clear()
 
     @staticmethod
-    def clear_process(command):
-        """Clears a specific process by it's command."""
-        for i, p in enumerate(ProcessManager.PROCESSES):
-            if p.command == command:
-                ProcessManager.PROCESSES[i], ProcessManager.PROCESSES[-1] = \
-                    ProcessManager.PROCESSES[-1], ProcessManager.PROCESSES[i]
-                ProcessManager.PROCESSES.pop()
-                break
+    def clear_process(process):
+        """Clears a specific process.
+
+        Args:
+            process: The process.
+        """
+        ProcessManager.PROCESSES.pop(process.pid, None)
 
     @staticmethod
     def failed_processes():
@@ -93,7 +94,8 @@ class ProcessManager:
             A list of failed CommandProcesses.
         """
         # Returns code other than 0 indicates error
-        return [p for p in ProcessManager.PROCESSES if p[1].poll() not in (None, 0)]
+        return [p for p in ProcessManager.PROCESSES.values()
+                if p.process.poll() not in (None, 0)]
 
     @staticmethod
     def finished_processes():
@@ -103,7 +105,8 @@ class ProcessManager:
             A list of finished CommandProcesses.
         """
         # Return code 0 indicates success
-        return [p for p in ProcessManager.PROCESSES if p[1].poll() in (None, 0)]
+        return [p for p in ProcessManager.PROCESSES.values()
+                if p.process.poll() in (None, 0)]
 
     @staticmethod
     def has_current_processes():
@@ -119,9 +122,9 @@ class ProcessManager:
         """Kills the processes."""
         printf('Killing running processes...', print_type=PrintType.DEBUG_LOG)
 
-        for command_name, process in ProcessManager.PROCESSES:
+        for command_name, process in ProcessManager.PROCESSES.values():
             try:
-                printf('Killing process %s [%s]' % (command_name, process.id),
+                printf('Killing process %s [%s]' % (command_name, process.pid),
                        print_type=PrintType.DEBUG_LOG)
                 os.killpg(os.getpgid(process.pid), signal.SIGTERM)
             except Exception as err:
@@ -134,7 +137,7 @@ class ProcessManager:
         printf('Outputting running process information...',
                print_type=PrintType.DEBUG_LOG)
 
-        for command_name, process in ProcessManager.PROCESSES:
+        for command_name, process in ProcessManager.PROCESSES.values():
             out, err = process.communicate()
             if out:
                 printf('command {} output\n{}'
@@ -160,12 +163,9 @@ def change_nomerges(device, nomerges):
     printf('Changing nomerges for device {} to {}'.format(device, nomerges),
            print_type=PrintType.DEBUG_LOG)
 
-    command = 'bash -c "echo {} > /sys/block/{}/queue/nomerges"' \
-              .format(nomerges, match_regex(device, 'device_name'))
+    path = '/sys/block/{}/queue/nomerges'.format(get_device_name(device))
 
-    _, rc = run_command(command)
-
-    if rc != 0:
+    if not _write_system_file(path, nomerges):
         raise DeviceSettingChangeError(
             'Unable to change nomerges to {} for device {}'
             .format(nomerges, device)
@@ -185,12 +185,9 @@ def change_randomize_va_space(randomize_va_space):
            .format(randomize_va_space),
            print_type=PrintType.DEBUG_LOG)
 
-    command = 'bash -c "echo {} > /proc/sys/kernel/randomize_va_space"' \
-              .format(randomize_va_space)
-
-    _, rc = run_command(command)
+    path = '/proc/sys/kernel/randomize_va_space'
 
-    if rc != 0:
+    if not _write_system_file(path, randomize_va_space):
         raise SystemSettingChangeError(
             'Unable to change randomize_va_space to {} for system'
             .format(randomize_va_space)
@@ -210,12 +207,9 @@ def change_scheduler(device, scheduler):
     printf('Changing scheduler for device {} to {}'.format(device, scheduler),
            print_type=PrintType.DEBUG_LOG)
 
-    command = 'bash -c "echo {} > /sys/block/{}/queue/scheduler"' \
-              .format(scheduler, match_regex(device, 'device_name'))
+    path = '/sys/block/{}/queue/scheduler'.format(get_device_name(device))
 
-    _, rc = run_command(command)
-
-    if rc != 0:
+    if not _write_system_file(path, scheduler):
         raise SchedulerChangeError(
             'Unable to change scheduler to {} for device {}'
             .format(scheduler, device)
@@ -234,7 +228,7 @@ def check_command(command):
     printf('Checking if command {} exists'.format(command),
            print_type=PrintType.DEBUG_LOG)
 
-    if run_system_command('command -v {}'.format(command)) == 0:
+    if shutil.which(command) is not None:
         return True
 
     printf('Command {} does not exist'.format(command),
@@ -262,13 +256,25 @@ def clear_caches(device):
            print_type=PrintType.DEBUG_LOG)
 
     # Writes any data buffered in memory out to disk
-    run_system_command('sync')
+    os.sync()
 
     # Drops clean caches
-    run_system_command('echo 3 > /proc/sys/vm/drop_caches')
+    try:
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+    except OSError as err:
+        printf('Unable to drop caches\n{}'.format(err),
+               print_type=PrintType.DEBUG_LOG)
 
     # Calls block device ioctls to flush buffers
-    run_system_command('blockdev --flushbufs {}'.format(device))
+    try:
+        fd = os.open(device, os.O_RDONLY)
+        try:
+            fcntl.ioctl(fd, _BLKFLSBUF)
+        finally:
+            os.close(fd)
+    except OSError:
+        run_system_command('blockdev --flushbufs {}'.format(device))
 
     # Flushes the on-drive write cache buffer
     run_system_command('hdparm -F {}'.format(device))
@@ -304,17 +310,18 @@ def get_device_major_minor(device):
     printf('Retrieving major,minor for device {}'.format(device),
            print_type=PrintType.DEBUG_LOG)
 
-    out, _ = run_command('stat -c \'%%t,%%T\' {}'.format(device))
-
-    if not out:
-        printf('Unable to retrieve major,minor information for device {}'
-               .format(device),
-               print_Type=PrintType.ERROR_LOG)
+    try:
+        rdev = os.stat(device).st_rdev
+    except OSError as err:
+        printf('Unable to retrieve major,minor information for device {}\n{}'
+               .format(device, err),
+               print_type=PrintType.ERROR_LOG)
         return None
 
-    out = out.strip()
+    # Hexadecimal, matching the `stat -c '%t,%T'` format
+    out = '{:x},{:x}'.format(os.major(rdev), os.minor(rdev))
     printf('major,minor for device {} is {}'.format(device, out),
-           print_Type=PrintType.DEBUG_LOG)
+           print_type=PrintType.DEBUG_LOG)
 
     return out
 
@@ -331,11 +338,11 @@ def get_device_nomerges(device):
     printf('Retrieving nomerges for device {}'.format(device),
            print_type=PrintType.DEBUG_LOG)
 
-    device_name = match_regex(device, 'device_name')
+    device_name = get_device_name(device)
 
-    out, rc = run_command('cat /sys/block/{}/queue/nomerges'.format(device_name))
+    out = _read_system_file('/sys/block/{}/queue/nomerges'.format(device_name))
 
-    if rc != 0:
+    if out is None:
         printf('Unable to find nomerges for device',
                print_type=PrintType.ERROR_LOG)
         return []
@@ -355,11 +362,11 @@ def get_device_scheduler(device):
     printf('Retrieving schedulers for device {}'.format(device),
            print_type=PrintType.DEBUG_LOG)
 
-    device_name = match_regex(device, 'device_name')
+    device_name = get_device_name(device)
 
-    out, rc = run_command('cat /sys/block/{}/queue/scheduler'.format(device_name))
+    out = _read_system_file('/sys/block/{}/queue/scheduler'.format(device_name))
 
-    if rc != 0:
+    if out is None:
         printf('Unable to find schedulers for device',
                print_type=PrintType.ERROR_LOG)
         return []
@@ -383,9 +390,9 @@ def get_randomize_va_space():
     printf('Retrieving randomize_va_space for system',
            print_type=PrintType.DEBUG_LOG)
 
-    out, rc = run_command('cat /proc/sys/kernel/randomize_va_space')
+    out = _read_system_file('/proc/sys/kernel/randomize_va_space')
 
-    if rc != 0:
+    if out is None:
         printf('Unable to find randomize_va_space for system',
                print_type=PrintType.ERROR_LOG)
         return []
@@ -405,11 +412,11 @@ def get_schedulers_for_device(device):
     printf('Retrieving schedulers for device {}'.format(device),
            print_type=PrintType.DEBUG_LOG)
 
-    device_name = match_regex(device, 'device_name')
+    device_name = get_device_name(device)
 
-    out, rc = run_command('cat /sys/block/{}/queue/scheduler'.format(device_name))
+    out = _read_system_file('/sys/block/{}/queue/scheduler'.format(device_name))
 
-    if rc != 0:
+    if out is None:
         printf('Unable to find schedulers for device',
                print_type=PrintType.ERROR_LOG)
         return []
@@ -474,16 +481,14 @@ def is_rotational_device(device):
     printf('Checking whether device {} is a rotational device'.format(device),
            print_type=PrintType.DEBUG_LOG)
 
-    device_name = match_regex(device, 'device_name')
+    device_name = get_device_name(device)
 
     if not device_name:
         return False
 
-    out, rc = run_command(
-        'cat /sys/block/{}/queue/rotational'.format(device_name)
-    )
+    out = _read_system_file('/sys/block/{}/queue/rotational'.format(device_name))
 
-    if rc != 0:
+    if out is None:
         return False
 
     if int(out) == 1:
@@ -496,59 +501,85 @@ def is_rotational_device(device):
     return int(out) == 1
 
 
+def _read_system_file(path):
+    """Reads a sysfs or procfs file.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The contents of the file, or None if erred.
+    """
+    printf('Reading file {}'.format(path), print_type=PrintType.DEBUG_LOG)
+
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError as err:
+        printf('Unable to read file {}\n{}'.format(path, err),
+               print_type=PrintType.ERROR_LOG)
+        return None
+
+
+def _write_system_file(path, value):
+    """Writes a value to a sysfs or procfs file.
+
+    Args:
+        path: The path of the file.
+        value: The value to write.
+
+    Returns:
+        True if successful, else False.
+    """
+    printf('Writing {} to file {}'.format(value, path),
+           print_type=PrintType.DEBUG_LOG)
+
+    try:
+        with open(path, 'w') as f:
+            f.write('{}\n'.format(value))
+        return True
+    except OSError as err:
+        printf('Unable to write {} to file {}\n{}'.format(value, path, err),
+               print_type=PrintType.ERROR_LOG)
+        return False
+
+
 def run_command(command, ignore_output=False):
     """Runs a command via subprocess communication.
 
     Args:
         command: The command.
-        ignore_output: (OPTIONAL) Whether to ignore the output. Defaults to
-            False.
+        ignore_output: (OPTIONAL) Whether to ignore the standard output.
+            Errors are still logged. Defaults to False.
 
     Returns:
         A tuple containing (the output, the return code).
     """
     printf('Running command {}'.format(command), print_type=PrintType.DEBUG_LOG)
 
+    # Ignored output is discarded by the kernel rather than piped and decoded
+    stdout = subprocess.DEVNULL if ignore_output else subprocess.PIPE
+    p = None
+
     try:
         args = shlex.split(command)
         p = subprocess.Popen(
             args,
-            stdout=subprocess.PIPE,
+            stdout=stdout,
             stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            preexec_fn=os.setsid)
+            stdin=subprocess.DEVNULL,
+            start_new_session=True)
 
         ProcessManager.add_process(command, p)
 
-        if ignore_output:
-            return None, _wait_for_process(command, p)
-
         return _communicate_to_process(command, p)
     except (ValueError, subprocess.CalledProcessError, FileNotFoundError) as err:
         printf('Command {} erred:\n{}'.format(command, err),
                print_type=PrintType.ERROR_LOG)
         return None, None
     finally:
-        ProcessManager.clear_process(command)
-
-
-def _wait_for_process(command, p):
-    """Waits for a process to complete.
-
-    Args:
-        command: The command.
-        p: The process.
-
-    Returns:
-        The return code.
-    """
-    rc = p.wait()
-
-    if rc != 0:
-        printf('Command {} [{}] erred with return code {}'
-               .format(command, p.pid, rc),
-               print_type=PrintType.ERROR_LOG)
-    return rc
+        if p is not None:
+            ProcessManager.clear_process(p)
 
 
 def _communicate_to_process(command, p):
@@ -559,7 +590,7 @@ def _communicate_to_process(command, p):
         p: The process.
 
     Returns:
-        A tuple of the output and return code.
+        A tuple of the output, or None if it wasn't piped, and return code.
     """
     out, err = p.communicate()
     rc = p.returncode
@@ -569,6 +600,9 @@ def _communicate_to_process(command, p):
                .format(command, p.pid, rc, err.decode('utf-8')),
                print_type=PrintType.ERROR_LOG)
 
+    if out is None:
+        return None, rc
+
     return out.decode('utf-8'), rc
 
 
@@ -591,8 +625,8 @@ def run_command_nowait(command):
             args,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            preexec_fn=os.setsid)
+            stdin=subprocess.DEVNULL,
+            start_new_session=True)
 
         ProcessManager.add_process(command, p)
         return p
@@ -600,7 +634,6 @@ def run_command_nowait(command):
     except (ValueError, subprocess.CalledProcessError, FileNotFoundError) as err:
         printf('Command {} erred:\n{}'.format(command, err),
                print_type=PrintType.ERROR_LOG)
-        ProcessManager.clear_process(command)
         return None
 
 
@@ -615,6 +648,21 @@ def run_system_command(command, silence=True):
     Returns:
         The return code.
     """
+    # Simple commands are executed directly, skipping the shell
+    if silence and not get_regex('shell_syntax').search(command):
+        printf('Running command {}'.format(command),
+               print_type=PrintType.DEBUG_LOG)
+
+        try:
+            return subprocess.call(shlex.split(command),
+                                   stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL,
+                                   stdin=subprocess.DEVNULL)
+        except Exception as err:
+            printf('Error occurred running command {}\n{}'.format(command, err),
+                   print_type=PrintType.ERROR_LOG)
+            return -1
+
     if silence:
         command = '{} >/dev/null 2>&1'.format(command)
 
@@ -641,6 +689,7 @@ def terminate_process(process):
     process.terminate()
     out, err = process.communicate()
     rc = process.returncode
+    ProcessManager.clear_process(process)
 
     if err:
         printf('Process [{}] erred with return code {}:\n{}'
@@ -15,6 +15,7 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
 
+from functools import lru_cache
 import os
 import re
 
@@ -31,19 +32,23 @@ _CONSTANTS = {
     'config_header_global': 'global',
     'config_header_output': 'output',
     'config_header_template': 'template',
-    'valid_workload_types': {'filebench', 'fio'}
+    'valid_workload_types': frozenset({'filebench', 'fio'})
 }
 
 _FORMATTERS = {
     'blktrace': 'blktrace -d {} -o {} -b 16384 -n 8',  # device, device_name
     'blkparse': 'blkparse -i {0} -d {0}.blkparse.bin -q -O -M',  # device_name
+    'blktrace_trace': '{}.blktrace.*',  # device_name
     'btt': 'btt -i {}.blkparse.bin',  # device_name
     'cleanup_blktrace': '{0}.blktrace.* {0}.blkparse.bin *_iops_fp.dat *_mbps_fp.dat',  # device_name
     'template': '<%{}%>'
 }
 
 _REGEX = {
-    'device_name': re.compile(r'/dev/(.*)')
+    'btt_latency': re.compile(r'^(d2c|g2i|i2d|q2c|q2g|q2q).*$',
+                              re.IGNORECASE | re.MULTILINE),
+    'device_name': re.compile(r'/dev/(.*)'),
+    'shell_syntax': re.compile(r'[|&;<>()$`\\"\'*?\[\]{}~=\n]')
 }
 
 
@@ -91,6 +96,16 @@ class SettingsManager:
         """
         setattr(SettingsManager, setting, value)
 
+    @staticmethod
+    def update(settings):
+        """Sets multiple attributes on self.
+
+        Args:
+            settings: A mapping of attributes to the values to set them to.
+        """
+        for setting, value in settings.items():
+            setattr(SettingsManager, setting, value)
+
 
 def get_constant(name):
     """Retrieves a constant.
@@ -112,6 +127,19 @@ def get_constant(name):
     return _CONSTANTS[name]
 
 
+@lru_cache(maxsize=64)
+def get_device_name(device):
+    """Retrieves the name of a device (i.e. `sda` for `/dev/sda`).
+
+    Args:
+        device: The device.
+
+    Returns:
+        The device name, or None if `device` is not a device path.
+    """
+    return match_regex(device, 'device_name')
+
+
 def get_formatter(name):
     """Retrieves a formatter.
 
@@ -132,6 +160,24 @@ def get_formatter(name):
     return _FORMATTERS[name]
 
 
+def get_regex(name):
+    """Retrieves a compiled regex.
+
+    Args:
+        name: The name of the regex.
+
+    Returns:
+        The compiled regex.
+
+    Raises:
+        UndefinedRegexError: If regex is not defined.
+    """
+    if name not in _REGEX:
+        raise UndefinedRegexError('regex {} is not defined'.format(name))
+
+    return _REGEX[name]
+
+
 def is_valid_workload_type(workload_type):
     """Validates a given workload type.
 
@@ -76,10 +76,10 @@ def try_split(s, delimiter=',', convert_type=str):
         The string split into a list.
     """
     if isinstance(delimiter, tuple):
-        for d in delimiter:
-            if d in s:
-                return [convert_type(i.strip()) for i in s.split(d)]
-    elif delimiter in s:
-        return [convert_type(i.strip()) for i in s.split(delimiter)]
+        delimiter = next((d for d in delimiter if d in s), None)
 
-    return [convert_type(s.strip())]
+        if delimiter is None:
+            return [convert_type(s.strip())]
+
+    # NOTE: Splitting a string without the delimiter yields the string itself
+    return [convert_type(i.strip()) for i in s.split(delimiter)]
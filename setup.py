@@ -61,5 +61,10 @@ setup(
     python_requires='>=3.4',
     install_requires=[
         'colorama'
-    ]
+    ],
+    extras_require={
+        'speedups': [
+            'orjson; python_version >= "3.8"'
+        ]
+    }
 )